@@ -10,20 +10,21 @@ import os
 import sys
 import signal
 import threading
-import queue
 import curses
-from typing import Optional
+from typing import Optional, TextIO
+from functools import lru_cache
+from collections import deque
+from itertools import count
+from heapq import heappush, heappop
 from glob import glob
-from re import sub, escape
 from socket import gethostbyname_ex, gethostbyaddr, inet_aton, inet_ntoa
 from shlex import quote
 from time import time, strftime, sleep
 from datetime import timedelta, datetime
 from subprocess import Popen, DEVNULL
-from io import BufferedReader, TextIOWrapper
+from io import BufferedReader, TextIOWrapper, StringIO
 from argparse import ArgumentParser, Namespace, RawTextHelpFormatter
 from dataclasses import dataclass
-from copy import deepcopy
 import argcomplete
 from colorama import Fore, Style, init
 from ssh_para.version import __version__
@@ -42,10 +43,42 @@ EXIT_CODE = 0
 
 DNS_DOMAINS = DNS_DOMAINS.split()
 SSH_OPTS = SSH_OPTS.split()
+SIGPIPE = getattr(signal, "SIGPIPE", None)  # not available on Windows
+HOME = os.path.expanduser("~/")
+READ_BUFSIZE = 65536  # buffer size to read job output files
+UTF8_CONTINUATION = bytes(range(0x80, 0xC0))
+
+
+class JobQueue:
+    """jobs loaded before JobRun threads start, dispatched without lock"""
+
+    def __init__(self) -> None:
+        self.jobs = []
+        self.index = count()
+        self.dispatched = 0
+
+    def put(self, job: "Job") -> None:
+        """add job to run"""
+        self.jobs.append(job)
+
+    def get(self) -> Optional["Job"]:
+        """next job to run, None if all jobs dispatched"""
+        i = next(self.index)  # atomic under GIL
+        self.dispatched = i + 1
+        if i < len(self.jobs):
+            return self.jobs[i]
+        return None
+
+    def empty(self) -> bool:
+        """all jobs dispatched"""
+        return self.dispatched >= len(self.jobs)
 
-jobq = queue.Queue()
-printq = queue.Queue()
-pauseq = queue.Queue()
+
+jobq = JobQueue()
+printq = deque()  # JobStatus events from JobRun threads to JobPrint
+printev = threading.Event()  # set when printq has pending events
+unpaused = threading.Event()  # cleared while JobRun threads are paused
+unpaused.set()
 
 
 def shell_argcomplete(shell: str = "bash") -> None:
@@ -167,8 +200,9 @@ def sigint_handler(*args) -> None:
 
 def hometilde(directory: str) -> str:
     """substitute home to tilde in dir"""
-    home = os.path.expanduser("~/")
-    return sub(rf"^{escape(home)}", "~/", directory)
+    if directory.startswith(HOME):
+        return "~/" + directory[len(HOME) :]
+    return directory
 
 
 def resolve_hostname(host: str) -> Optional[str]:
@@ -202,6 +236,7 @@ def resolve_ip(ip: str) -> str:
     return host[0]
 
 
+@lru_cache(maxsize=None)
 def is_ip(host: str) -> bool:
     """determine if host is valid ip"""
     try:
@@ -223,6 +258,12 @@ def resolve_hosts(hosts: list, domains: list) -> list:
     return [resolve(host, domains) for host in hosts]
 
 
+def post_status(jstatus: "JobStatus") -> None:
+    """send job status event to JobPrint thread"""
+    printq.append(jstatus)  # deque append is thread safe
+    printev.set()
+
+
 def addstr(stdscr: Optional["curses._CursesWindow"], *args, **kwargs) -> None:
     """curses addstr w/o exception"""
     if stdscr:
@@ -239,16 +280,30 @@ def addstrc(stdscr: Optional["curses._CursesWindow"], *args, **kwargs) -> None:
         stdscr.clrtoeol()
 
 
+def gauge(duration: float, avgjobdur: float) -> int:
+    """job progress on 10 from average job duration"""
+    if not avgjobdur:
+        return 0
+    return min(int(round(duration / avgjobdur * 10, 0)), 10)
+
+
 def tdelta(*args, **kwargs) -> str:
     """timedelta without microseconds"""
     return str(timedelta(*args, **kwargs)).split(".", maxsplit=1)[0]
 
 
 def print_tee(
-    *args, file: Optional[TextIOWrapper] = None, color: str = "", **kwargs
+    *args,
+    file: Optional[TextIO] = None,
+    color: str = "",
+    out: Optional[TextIO] = None,
+    **kwargs,
 ) -> None:
-    """print stdout + file"""
-    print(" ".join([color] + list(args)), file=sys.stderr, **kwargs)
+    """print stderr (or out) + file"""
+    text = " ".join([color] + list(args))
+    if color:
+        text += Style.RESET_ALL  # out may be buffered: no colorama autoreset
+    print(text, file=out or sys.stderr, **kwargs)
     if file:
         print(*args, file=file, **kwargs)
 
@@ -261,25 +316,16 @@ def decode_line(line: bytes) -> str:
         return ""
 
 
-def last_line(fd: BufferedReader, maxline: int = 1000) -> str:
-    """last non empty line of file"""
-    line = "\n"
-    fd.seek(0, os.SEEK_END)
-    size = 0
-    while line in ["\n", "\r"] and size < maxline:
-        try:  # catch if file empty / only empty lines
-            while fd.read(1) not in [b"\n", b"\r"]:
-                fd.seek(-2, os.SEEK_CUR)
-                size += 1
-        except OSError:
-            fd.seek(0)
-            line = decode_line(fd.readline())
-            break
-        line = decode_line(fd.readline())
-        fd.seek(-4, os.SEEK_CUR)
-    return line.strip()
+def last_line(fd: BufferedReader, maxline: int = 4096) -> str:
+    """last non empty line of file (within last maxline bytes)"""
+    size = fd.seek(0, os.SEEK_END)
+    fd.seek(max(0, size - maxline))
+    # skip partial utf-8 char at start of tail block
+    tail = fd.read().lstrip(UTF8_CONTINUATION).replace(b"\r", b"\n").rstrip()
+    return decode_line(tail.rpartition(b"\n")[2]).strip()
 
 
+@lru_cache(maxsize=None)
 def short_host(host: str) -> str:
     """remove dns domain from fqdn"""
     if is_ip(host):
@@ -320,13 +366,15 @@ class Segment:
         for i in range(0, nbsegments):
             curses.init_pair(i * 2 + 2, fg[i], bg[i])
             curses.init_pair(i * 2 + 3, bg[i], bg[i + 1])
+        self.pairs = [curses.color_pair(i) for i in range(nbsegments * 2 + 2)]
 
     def set_segments(self, x: int, y: int, segments: list) -> None:
         """display powerline"""
-        addstr(self.stdscr, y, x, SYMBOL_BEGIN, curses.color_pair(1))
+        pairs = self.pairs
+        addstr(self.stdscr, y, x, SYMBOL_BEGIN, pairs[1])
         for i, segment in enumerate(segments):
-            addstr(self.stdscr, f" {segment} ", curses.color_pair(i * 2 + 2))
-            addstr(self.stdscr, SYMBOL_END, curses.color_pair(i * 2 + 3))
+            addstr(self.stdscr, f" {segment} ", pairs[i * 2 + 2])
+            addstr(self.stdscr, SYMBOL_END, pairs[i * 2 + 3])
         self.stdscr.clrtoeol()
 
 
@@ -338,6 +386,7 @@ class JobStatus:
     start: float = 0
     host: str = ""
     shorthost: str = ""
+    displayhost: str = ""  # padded shorthost for curses display
     duration: float = 0
     pid: int = -1
     exit: Optional[int] = None
@@ -345,6 +394,11 @@ class JobStatus:
     log: str = ""
     thread_id: int = -1
     fdlog: Optional[BufferedReader] = None
+    logsize: int = -1
+
+    def snapshot(self) -> "JobStatus":
+        """shallow copy of status to send to printq (fields are immutable)"""
+        return JobStatus(**self.__dict__)
 
 
 class JobStatusLog:
@@ -398,6 +452,8 @@ class JobPrint(threading.Thread):
         "IDLE": 106,
     }
 
+    status_label = {status: f" {status:8} " for status in status_color}
+
     COLOR_GAUGE = 108
     COLOR_HOST = 110
 
@@ -409,7 +465,6 @@ class JobPrint(threading.Thread):
         dirlog: str,
         timeout: float = 0,
         verbose: bool = False,
-        maxhostlen: int = 15,
     ):
         """init properties / thread"""
         super().__init__()
@@ -427,8 +482,10 @@ class JobPrint(threading.Thread):
         self.paused = False
         self.timeout = timeout
         self.verbose = verbose
-        self.maxhostlen = maxhostlen
         self.killedpid = {}
+        self.deadlines = []  # heap of (timeout deadline, thread_id, pid)
+        self.painted = {}  # line => signature of job row displayed
+        self.screen_size = (0, 0)
         self.pdirlog = hometilde(dirlog)
         self.jobstatuslog = JobStatusLog(dirlog)
         if sys.stdout.isatty():
@@ -468,6 +525,12 @@ class JobPrint(threading.Thread):
         curses.init_pair(self.status_color["IDLE"] + 1, 8, curses.COLOR_BLACK)
         curses.init_pair(self.COLOR_GAUGE, 8, curses.COLOR_BLUE)
         curses.init_pair(self.COLOR_HOST, curses.COLOR_YELLOW, curses.COLOR_BLACK)
+        self.status_attr = {
+            status: (curses.color_pair(color), curses.color_pair(color + 1))
+            for status, color in self.status_color.items()
+        }
+        self.gauge_attr = curses.color_pair(self.COLOR_GAUGE)
+        self.host_attr = curses.color_pair(self.COLOR_HOST)
 
     def killall(self) -> None:
         """kill all running threads pid"""
@@ -482,15 +545,14 @@ class JobPrint(threading.Thread):
         while True:
             if INTERRUPT:
                 self.abort_jobs()
-            try:
-                jstatus: Optional[JobStatus] = printq.get(timeout=0.1)
-            except queue.Empty:
-                jstatus = None
+            printev.wait(0.1)
+            printev.clear()
             th_id = None
-            if jstatus:
+            while printq:
+                jstatus: JobStatus = printq.popleft()
                 if not jstatus.fdlog:  # start RUNNING
                     jstatus.fdlog = open(jstatus.logfile, "rb")
-                jstatus.log = last_line(jstatus.fdlog)
+                self.update_log(jstatus)
                 if jstatus.exit is not None:  # FINISHED
                     jstatus.fdlog.close()
                     jstatus.fdlog = None
@@ -508,6 +570,11 @@ class JobPrint(threading.Thread):
                             jstatus.exit = 256
                     self.jobstatuslog.addhost(jstatus.host, jstatus.status)
                     self.job_status.append(jstatus)
+                elif self.timeout:
+                    heappush(
+                        self.deadlines,
+                        (jstatus.start + self.timeout, jstatus.thread_id, jstatus.pid),
+                    )
                 self.th_status[jstatus.thread_id] = jstatus
                 if not self.stdscr:
                     try:
@@ -516,11 +583,10 @@ class JobPrint(threading.Thread):
                         )
                     except BrokenPipeError:
                         pass
+            self.check_timeouts()
             total_dur = tdelta(seconds=round(time() - self.startsec))
             if self.stdscr:
                 self.display_curses(th_id, total_dur, jobsdur, nbsshjobs)
-            else:
-                self.check_timeouts()
             if len(self.job_status) == self.nbjobs:
                 break
         self.resume()
@@ -532,36 +598,55 @@ class JobPrint(threading.Thread):
             self.stdscr.getch()
             curses.endwin()
 
-    def check_timeout(self, th_id: int, duration: float) -> None:
-        """kill ssh if duration exceeds timeout"""
-        if not self.timeout:
-            return
-        if duration > self.timeout:
-            self.kill(th_id, "TIMEOUT")
+    def update_log(self, jstatus: JobStatus) -> None:
+        """get last line of job output only if log file size changed"""
+        assert jstatus.fdlog is not None
+        size = os.fstat(jstatus.fdlog.fileno()).st_size
+        if size != jstatus.logsize:
+            jstatus.logsize = size
+            jstatus.log = last_line(jstatus.fdlog)
 
     def check_timeouts(self) -> None:
-        """check threads timemout"""
-        for i, jstatus in enumerate(self.th_status):
-            if jstatus.status == "RUNNING":
-                duration = time() - jstatus.start
-                self.check_timeout(i, duration)
+        """kill ssh of running jobs exceeding timeout"""
+        now = time()
+        while self.deadlines and self.deadlines[0][0] < now:
+            _, th_id, pid = heappop(self.deadlines)
+            jstatus = self.th_status[th_id]
+            if jstatus.pid == pid and jstatus.status == "RUNNING":
+                self.kill(th_id, "TIMEOUT")
+                # resend SIGINT until job is finished
+                heappush(self.deadlines, (now + 1, th_id, pid))
+
+    def row_changed(self, line_num: int, row) -> bool:
+        """record row displayed at line, False if already on screen"""
+        if self.painted.get(line_num) == row:
+            return False
+        self.unpaint(line_num)
+        self.painted[line_num] = row
+        if self.verbose:  # row on 2 lines
+            self.painted.pop(line_num + 1, None)
+        return True
+
+    def unpaint(self, line_num: int) -> None:
+        """line overwritten: row(s) displayed on it must be repainted"""
+        self.painted.pop(line_num, None)
+        if self.verbose:
+            self.painted.pop(line_num - 1, None)
 
     def print_status(
         self, status: str, duration: float = 0, avgjobdur: float = 0
     ) -> None:
         """print thread status"""
-        color = self.status_color[status]
-        addstr(self.stdscr, SYMBOL_BEGIN, curses.color_pair(color + 1))
+        attr, attr_border = self.status_attr[status]
+        addstr(self.stdscr, SYMBOL_BEGIN, attr_border)
         if status == "RUNNING" and avgjobdur:
-            pten = min(int(round(duration / avgjobdur * 10, 0)), 10)
+            pten = gauge(duration, avgjobdur)
             addstr(
-                self.stdscr,
-                SYMBOL_PROG * pten + " " * (10 - pten),
-                curses.color_pair(self.COLOR_GAUGE),
+                self.stdscr, SYMBOL_PROG * pten + " " * (10 - pten), self.gauge_attr
             )  # ▶
         else:
-            addstr(self.stdscr, f" {status:8} ", curses.color_pair(color))
-        addstr(self.stdscr, SYMBOL_END, curses.color_pair(color + 1))
+            addstr(self.stdscr, self.status_label[status], attr)
+        addstr(self.stdscr, SYMBOL_END, attr_border)
         addstr(self.stdscr, f" {tdelta(seconds=round(duration))}")
 
     def print_job(self, line_num: int, jstatus, duration: float, avgjobdur: float):
@@ -571,15 +656,16 @@ class JobPrint(threading.Thread):
         self.print_status(jstatus.status, duration, avgjobdur)
         addstr(self.stdscr, f" {str(jstatus.pid):>7} ")
         if self.verbose:
-            addstrc(self.stdscr, jstatus.host, curses.color_pair(self.COLOR_HOST))
-            addstrc(self.stdscr, line_num + 1, 0, "     " + jstatus.log)
+            addstrc(self.stdscr, jstatus.host, self.host_attr)
+            addstrc(
+                self.stdscr, line_num + 1, 0, f"     {jstatus.log}"[: curses.COLS - 1]
+            )
         else:
-            addstr(
-                self.stdscr,
-                f"{jstatus.shorthost:{self.maxhostlen}} {SYMBOL_RES} ",
-                curses.color_pair(self.COLOR_HOST),
+            addstr(self.stdscr, jstatus.displayhost, self.host_attr)
+            # keep last column free: no wrap clearing next row
+            addstrc(
+                self.stdscr, jstatus.log[: curses.COLS - self.stdscr.getyx()[1] - 1]
             )
-            addstrc(self.stdscr, jstatus.log[: curses.COLS - self.stdscr.getyx()[1]])
 
     def display_curses(
         self, status_id: Optional[int], total_dur: str, jobsdur, nbsshjobs
@@ -590,28 +676,42 @@ class JobPrint(threading.Thread):
         last_start = 0
         avgjobdur = 0
         curses.update_lines_cols()
+        lines = curses.LINES
+        if self.screen_size != (lines, curses.COLS):
+            self.screen_size = (lines, curses.COLS)
+            self.painted.clear()
         self.get_key()
         if nbsshjobs:
             avgjobdur = jobsdur / nbsshjobs
         inter = self.verbose + 1
         line_num = 3
         nbrun = 0
+        now = time()
         for jstatus in self.th_status:
             if jstatus.fdlog and jstatus.thread_id != status_id:
-                jstatus.log = last_line(jstatus.fdlog)
+                self.update_log(jstatus)
             if jstatus.status == "RUNNING":
-                duration = time() - jstatus.start
-                self.check_timeout(jstatus.thread_id, duration)
+                duration = now - jstatus.start
                 last_start = max(last_start, jstatus.start)
                 nbrun += 1
-                if curses.LINES > line_num + 1:
-                    self.print_job(line_num, jstatus, duration, avgjobdur)
+                if lines > line_num + 1:
+                    row = (
+                        jstatus.thread_id,
+                        jstatus.pid,
+                        jstatus.host,
+                        round(duration),
+                        gauge(duration, avgjobdur) if avgjobdur else None,
+                        jstatus.log,
+                    )
+                    if self.row_changed(line_num, row):
+                        self.print_job(line_num, jstatus, duration, avgjobdur)
                     line_num += inter
             else:
                 duration = jstatus.duration
         addstrc(self.stdscr, line_num, 0, "")
+        self.unpaint(line_num)
         if nbsshjobs:
-            last_dur = time() - last_start
+            last_dur = now - last_start
             nbjobsq = max(min(self.nbthreads, nbrun), 1)
             estimated = tdelta(
                 seconds=round(
@@ -637,9 +737,9 @@ class JobPrint(threading.Thread):
         addstrc(self.stdscr, 2, 0, "")
         self.print_finished(line_num + (nbrun > 0))
         if self.paused:
-            addstrc(self.stdscr, curses.LINES - 1, 0, "[a]bort [k]ill [r]esume")
+            addstrc(self.stdscr, lines - 1, 0, "[a]bort [k]ill [r]esume")
         else:
-            addstrc(self.stdscr, curses.LINES - 1, 0, "[a]bort [k]ill [p]ause")
+            addstrc(self.stdscr, lines - 1, 0, "[a]bort [k]ill [p]ause")
         self.stdscr.refresh()
 
     def get_key(self) -> None:
@@ -690,72 +790,83 @@ class JobPrint(threading.Thread):
         """pause JobRun threads"""
         if not self.paused:
             self.paused = True
-            pauseq.put(True)
+            unpaused.clear()
 
     def resume(self) -> None:
         """resume JobRun threads"""
         if self.paused:
             self.paused = False
-            pauseq.get()
-            pauseq.task_done()
+            unpaused.set()
 
     def print_finished(self, line_num: int) -> None:
         """display finished jobs"""
         assert self.stdscr is not None
-        addstr(self.stdscr, curses.LINES - 1, 0, "")
+        lines = curses.LINES
+        addstr(self.stdscr, lines - 1, 0, "")
         inter = self.verbose + 1
         for jstatus in self.job_status[::-1]:
-            if curses.LINES < line_num + 2:
+            if lines < line_num + 2:
                 break
+            if not self.row_changed(line_num, id(jstatus)):
+                line_num += inter
+                continue
             addstr(self.stdscr, line_num, 0, "")
             self.print_status(jstatus.status, jstatus.duration)
             addstr(self.stdscr, f" exit:{str(jstatus.exit):>3} ")
             if self.verbose:
-                addstrc(self.stdscr, jstatus.host, curses.color_pair(self.COLOR_HOST))
-                addstrc(self.stdscr, line_num + 1, 0, "     " + jstatus.log)
-            else:
-                addstr(
+                addstrc(self.stdscr, jstatus.host, self.host_attr)
+                addstrc(
                     self.stdscr,
-                    f"{jstatus.shorthost:{self.maxhostlen}} {SYMBOL_RES} ",
-                    curses.color_pair(self.COLOR_HOST),
+                    line_num + 1,
+                    0,
+                    f"     {jstatus.log}"[: curses.COLS - 1],
                 )
+            else:
+                addstr(self.stdscr, jstatus.displayhost, self.host_attr)
                 addstrc(
-                    self.stdscr, jstatus.log[: curses.COLS - self.stdscr.getyx()[1]]
+                    self.stdscr, jstatus.log[: curses.COLS - self.stdscr.getyx()[1] - 1]
                 )
             line_num += inter
+        line_num = min(line_num, lines - 1)
+        self.stdscr.move(line_num, 0)
         self.stdscr.clrtobot()
+        for line in [line for line in self.painted if line >= line_num]:
+            del self.painted[line]
+        self.unpaint(line_num)
 
     def abort_jobs(self) -> None:
         """aborts remaining jobs"""
-        if not jobq.qsize():
+        job = jobq.get()
+        if job is None:
             return
-        while True:
-            try:
-                job = jobq.get(block=False)
-                job.status.status = "ABORTED"
-                job.status.exit = 256
-                self.job_status.append(job.status)
-                self.jobstatuslog.addhost(job.host, "ABORTED")
-                jobq.task_done()
-            except queue.Empty:
-                break
+        while job is not None:
+            job.status.status = "ABORTED"
+            job.status.exit = 256
+            self.job_status.append(job.status)
+            self.jobstatuslog.addhost(job.host, "ABORTED")
             self.aborted.append(job.host)
+            job = jobq.get()
         self.resume()
 
     def print_summary(self) -> None:
         """print/log summary of jobs"""
         end = strftime("%X")
         total_dur = tdelta(seconds=round(time() - self.startsec))
-        global_log = open(f"{self.dirlog}/ssh-para.log", "w", encoding="UTF-8")
-        print_tee("", file=global_log)
+        global_log = StringIO()  # summary buffered for single writes
+        out = StringIO()
+        print_tee("", file=global_log, out=out)
         nbrun = 0
         for jstatus in self.job_status:
             if jstatus.exit != 0:
                 color = Style.BRIGHT + Fore.RED
             else:
                 color = Style.BRIGHT + Fore.GREEN
-            print_tee(f"{jstatus.status:8}:", color=color, file=global_log, end=" ")
-            print_tee(jstatus.host, color=Fore.YELLOW, file=global_log, end=" ")
+            print_tee(
+                f"{jstatus.status:8}:", color=color, file=global_log, out=out, end=" "
+            )
+            print_tee(
+                jstatus.host, color=Fore.YELLOW, file=global_log, out=out, end=" "
+            )
             if jstatus.status != "ABORTED":
                 nbrun += 1
                 print_tee(
@@ -763,26 +874,31 @@ class JobPrint(threading.Thread):
                     f"dur: {tdelta(seconds=jstatus.duration)}",
                     f"{self.pdirlog}/{jstatus.host}.out",
                     file=global_log,
+                    out=out,
                 )
-            print_tee(" ", jstatus.log, file=global_log)
-        print_tee("command:", self.command, file=global_log)
-        print_tee("log directory:", self.pdirlog, file=global_log)
+            print_tee(" ", jstatus.log, file=global_log, out=out)
+        print_tee("command:", self.command, file=global_log, out=out)
+        print_tee("log directory:", self.pdirlog, file=global_log, out=out)
         start = datetime.fromtimestamp(self.startsec).strftime("%Y-%m-%d %H:%M:%S")
         print_tee(
             f"{nbrun}/{self.nbjobs} jobs run : begin: {start}",
             f"end: {end} dur: {total_dur}",
             file=global_log,
+            out=out,
         )
-        print_tee(self.jobstatuslog.result(), file=global_log)
+        print_tee(self.jobstatuslog.result(), file=global_log, out=out)
         if self.nbfailed == 0:
-            print_tee("All Jobs with exit code 0", file=global_log)
+            print_tee("All Jobs with exit code 0", file=global_log, out=out)
         else:
             print_tee(
                 f"WARNING : {str(self.nbfailed)} Job(s) with exit code != 0",
                 file=global_log,
+                out=out,
                 color=Style.BRIGHT + Fore.RED,
             )
-        global_log.close()
+        sys.stderr.write(out.getvalue())
+        with open(f"{self.dirlog}/ssh-para.log", "w", encoding="UTF-8") as fd:
+            fd.write(global_log.getvalue())
         printfile(
             f"begin: {start} end: {end} dur: {total_dur} runs: {nbrun}/{self.nbjobs} {self.jobstatuslog.result()}",
             file=f"{self.dirlog}/ssh-para.result",
@@ -792,11 +908,16 @@ class JobPrint(threading.Thread):
 class Job:
     """manage job execution"""
 
-    def __init__(self, host: str, command: list, resolve: bool):
+    def __init__(self, host: str, sshargs: list, resolve: bool, maxhostlen: int = 15):
         """job to run on host init"""
         self.host = host
-        self.command = command
-        self.status = JobStatus(host=host, shorthost=short_host(host))
+        self.sshargs = sshargs  # ssh options + command, shared by all jobs
+        shorthost = short_host(host)
+        self.status = JobStatus(
+            host=host,
+            shorthost=shorthost,
+            displayhost=f"{shorthost:{maxhostlen}} {SYMBOL_RES} ",
+        )
         self.resolve = resolve
 
     def run(self, fdout: TextIOWrapper, dirlog: str) -> None:
@@ -812,13 +933,13 @@ class Job:
             )
             self.status.status = "RUNNING"
             self.status.pid = pssh.pid
-            printq.put(deepcopy(self.status))  # deepcopy to fix pb with object in queue
+            post_status(self.status.snapshot())
             pssh.wait()
             self.update_status(pssh.returncode, dirlog)
         except Exception as e:
             self.status.status = "ERROR"
-            print(e, file=fdout)
-            printq.put(deepcopy(self.status))
+            print(e, file=fdout, flush=True)
+            post_status(self.status.snapshot())
             self.update_status(-1, dirlog)
 
     def exec(self, th_id: int, dirlog: str) -> None:
@@ -827,20 +948,17 @@ class Job:
         host = self.host
         if self.resolve:
             host = resolve(host, DNS_DOMAINS)
-        self.jobcmd = (
-            ["ssh", host, "-T", "-n", "-o", "BatchMode=yes"] + SSH_OPTS + self.command
-        )
+        self.jobcmd = ["ssh", host] + self.sshargs
         printfile(self.jobcmd, file=f"{dirlog}/{self.host}.ssh")
         self.status.logfile = f"{dirlog}/{self.host}.out"
         self.status.start = time()
-        with open(self.status.logfile, "w", encoding="UTF-8", buffering=1) as fdout:
+        with open(self.status.logfile, "w", encoding="UTF-8") as fdout:
             self.run(fdout, dirlog)
 
     def update_status(self, returncode: int, dirlog: str) -> None:
         self.status.exit = returncode
         self.status.duration = time() - self.status.start
         self.status.status = "SUCCESS" if returncode == 0 else "FAILED"
-        printq.put(deepcopy(self.status))  # deepcopy to fix pb with object in queue
         printfile(
             "EXIT CODE:",
             self.status.exit,
@@ -848,6 +966,7 @@ class Job:
             self.status.duration,
             file=f"{dirlog}/{self.host}.{self.status.status.lower()}",
         )
+        post_status(self.status)  # job is finished: status handed over to JobPrint
 
 
 class JobRun(threading.Thread):
@@ -864,15 +983,13 @@ class JobRun(threading.Thread):
     def run(self) -> None:
         """schedule Jobs / pause / resume"""
         while True:
-            pauseq.join()
+            unpaused.wait()
             if INTERRUPT:
                 break
-            try:
-                job: Job = jobq.get(block=False)
-            except queue.Empty:
+            job = jobq.get()
+            if job is None:
                 break
             job.exec(self.thread_id, self.dirlog)
-            jobq.task_done()
 
 
 def script_command(script: str, args: list) -> str:
@@ -942,6 +1059,23 @@ def printfile(*args, file: str = None) -> bool:
     return True
 
 
+def writelines(lines: list, file: str) -> bool:
+    """try write lines to file in one write"""
+    data = memoryview(("\n".join(lines) + "\n").encode("UTF-8"))
+    try:
+        fd = os.open(file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    except OSError:
+        return False
+    try:
+        while data:
+            data = data[os.write(fd, data) :]
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+    return True
+
+
 def readfile(file: str) -> Optional[str]:
     """try read from file"""
     try:
@@ -977,20 +1111,37 @@ def log_content(dirlog: str, wildcard: str) -> None:
     dirpattern = f"{dirlog}/{wildcard}"
     files = glob(dirpattern)
     files.sort()
+    status_out = wildcard.split(".")[-1] in ["success", "failed"]
+    multi = len(files) > 1
     for logfile in files:
-        if wildcard.split(".")[-1] in ["success", "failed"]:
-            logfile = ".".join(logfile.split(".")[:-1]) + ".out"
+        if status_out:
+            logfile = logfile.rpartition(".")[0] + ".out"
         prefix = ""
-        if len(files) > 1:
-            prefix = logfile.split("/")[-1]
+        if multi:
+            prefix = logfile.rpartition("/")[2]
             if not prefix.startswith("ssh-para.") and not prefix.endswith("list."):
                 prefix = short_host(prefix[:-4])
             prefix += ": "
-        log = readfile(logfile)
-        if log:
-            log = log.splitlines()
-            for line in log:
-                print(prefix + line.rstrip())
+        try:
+            with open(logfile, "r", encoding="UTF-8", buffering=READ_BUFSIZE) as fd:
+                empty = True
+                blanks = 0  # blank lines printed only if followed by text
+                for line in fd:
+                    line = line.rstrip()
+                    if not line:
+                        blanks += 1
+                        continue
+                    if empty:  # strip leading blanks as whole file strip()
+                        line = line.lstrip()
+                        blanks = 0
+                        empty = False
+                    for _ in range(blanks):
+                        print(prefix)
+                    blanks = 0
+                    print(prefix, line, sep="")
+        except OSError:
+            continue
+        if not empty:
             print()
 
 
@@ -1007,14 +1158,17 @@ def isdir(directory: str) -> bool:
 def get_latest_dir(dirlog: str) -> str:
     """retrieve last log dir"""
     try:
-        dirs = glob(f"{dirlog}/[0-9]*")
+        with os.scandir(dirlog) as entries:  # is_dir() w/o stat on most fs
+            dirs = [
+                entry.path
+                for entry in entries
+                if "0" <= entry.name[0] <= "9" and entry.is_dir()
+            ]
     except OSError:
         print(f"Error: ssh-para: no log directory found in {dirlog}", file=sys.stderr)
         sys.exit(1)
-    dirs.sort()
-    for directory in dirs[::-1]:
-        if isdir(directory):
-            return directory
+    if dirs:
+        return max(dirs)
     print(f"no log directory found in {dirlog}")
     sys.exit(1)
 
@@ -1103,32 +1257,37 @@ def main() -> None:
         f"Hostsfile: {hostsfile} Command: {' '.join(command)}",
         file=f"{dirlog}/ssh-para.command",
     )
-    printfile("\n".join(hosts), file=f"{dirlog}/hosts.list")
+    writelines(hosts, file=f"{dirlog}/hosts.list")
     max_len = 0
     for host in hosts:
         max_len = max(max_len, len(short_host(host)))
 
+    sshargs = ["-T", "-n", "-o", "BatchMode=yes"] + SSH_OPTS + args.ssh_args
     for host in hosts:
-        jobq.put(Job(host=host, command=args.ssh_args, resolve=args.resolve))
+        jobq.put(
+            Job(
+                host=host,
+                sshargs=sshargs,
+                resolve=args.resolve,
+                maxhostlen=max_len,
+            )
+        )
     parallel = min(len(hosts), args.parallel)
     signal.signal(signal.SIGINT, sigint_handler)
-    try:
-        signal.signal(signal.SIGPIPE, sigint_handler)
-    except AttributeError:
-        pass
-    p = JobPrint(
-        command, parallel, len(hosts), dirlog, args.timeout, args.verbose, max_len
-    )
+    if SIGPIPE is not None:
+        signal.signal(SIGPIPE, sigint_handler)
+    p = JobPrint(command, parallel, len(hosts), dirlog, args.timeout, args.verbose)
     p.start()
     jobruns = []
     for i in range(parallel):
-        if jobq.qsize() == 0:
+        if jobq.empty():
             break
         jobruns.append(JobRun(i, dirlog=dirlog))
         jobruns[i].start()
         sleep(args.delay)
 
-    jobq.join()
+    for jobrun in jobruns:
+        jobrun.join()
     p.join()
     sys.exit(EXIT_CODE)
 